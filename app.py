@@ -1,11 +1,17 @@
 
 import streamlit as st
-import speech_recognition as sr
-import pyttsx3
+import streamlit.components.v1 as components
 import threading
 import pandas as pd
+import hashlib
 import json
 import os
+import re
+import time
+from collections import deque
+from functools import partial
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # Try to import Google Generative AI
 try:
@@ -16,25 +22,21 @@ except ImportError:
 
 # Import document processor
 try:
-    from document_processor import process_document, get_file_info
+    from document_processor import process_documents, get_file_info, warm_ocr_models
     DOCUMENT_PROCESSING_AVAILABLE = True
 except ImportError:
     DOCUMENT_PROCESSING_AVAILABLE = False
 
-# Initialize text-to-speech engine safely
-engine = None
-try:
-    engine = pyttsx3.init()
-except Exception as e:
-    print(f"Warning: TTS engine could not be initialized (expected on Cloud): {e}")
+CONVERSATION_CONTEXT_MAX_ENTRIES = 20
 
 # Initialize session state attributes if not already set
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "conversation_context" not in st.session_state:
-    st.session_state.conversation_context = []
-if "interaction_log" not in st.session_state:
-    st.session_state.interaction_log = pd.DataFrame(columns=["user_query", "assistant_response"])
+    # Only the most recent turns are kept (User/Assistant entries)
+    st.session_state.conversation_context = deque(maxlen=CONVERSATION_CONTEXT_MAX_ENTRIES)
+if "interaction_log_rows" not in st.session_state:
+    st.session_state.interaction_log_rows = []
 
 # Ensure language_preference and user_logged_in are initialized
 if "language_preference" not in st.session_state:
@@ -42,62 +44,251 @@ if "language_preference" not in st.session_state:
 if "user_logged_in" not in st.session_state:
     st.session_state.user_logged_in = False
 
-# Function to convert text to speech using threading
+# Function to convert text to speech in the user's browser (Web Speech API)
 def speak(text):
-    if engine is None:
-        return
-    try:
-        def speak_thread():
-            try:
-                engine.say(text)
-                engine.runAndWait()
-            except:
-                pass
-        # Run the speech in a separate thread
-        thread = threading.Thread(target=speak_thread)
-        thread.start()
-    except Exception:
-        pass
+    # json.dumps gives a safe JS string literal; escape "</" so the text can't close the script tag
+    utterance = json.dumps(text).replace("</", "<\\/")
+    components.html(
+        f"""
+        <script>
+            window.speechSynthesis.cancel();
+            window.speechSynthesis.speak(new SpeechSynthesisUtterance({utterance}));
+        </script>
+        """,
+        height=0,
+    )
 
-# Function for voice input (speech to text)
-def listen():
+# Function for voice input (speech to text) on audio recorded in the browser
+def listen(audio_file):
     try:
+        import speech_recognition as sr
         recognizer = sr.Recognizer()
-        with sr.Microphone() as source:
-            st.info("Listening... Speak now.")
-            recognizer.adjust_for_ambient_noise(source)
-            audio = recognizer.listen(source, timeout=5)
-            try:
-                query = recognizer.recognize_google(audio)
-                st.success(f"Voice Input: {query}")
-                return query
-            except sr.UnknownValueError:
-                st.warning("Sorry, I couldn't understand that.")
-            except sr.RequestError:
-                st.error("Speech service is down.")
+        with sr.AudioFile(audio_file) as source:
+            audio = recognizer.record(source)
+        try:
+            query = recognizer.recognize_google(audio)
+            st.success(f"Voice Input: {query}")
+            return query
+        except sr.UnknownValueError:
+            st.warning("Sorry, I couldn't understand that.")
+        except sr.RequestError:
+            st.error("Speech service is down.")
     except Exception as e:
         st.warning("Voice input is not available on this device/server.")
         return None
 
-# Load patterns from JSON file
-def load_patterns():
+PATTERNS_FILE = 'legal_patterns.json'
+
+# Load patterns from JSON file (parsed once and pre-lowered for matching).
+# Keyed on the file's mtime (None when missing) so the persisted cache follows
+# edits to the file across restarts.
+@st.cache_data(persist="disk")
+def load_patterns(mtime):
     try:
-        with open('legal_patterns.json', 'r') as file:
-            return json.load(file)
+        with open(PATTERNS_FILE, 'r') as file:
+            patterns = json.load(file)
     except FileNotFoundError:
-        # Return empty list if file not found
-        return []
+        # Return empty patterns if file not found
+        return [], (), {}
     except json.JSONDecodeError:
-        # Return empty list if JSON is invalid
-        return []
+        # Return empty patterns if JSON is invalid
+        return [], (), {}
+
+    if not isinstance(patterns, list):
+        return [], (), {}
+
+    # Map each lowered pattern to its response; the first occurrence wins
+    response_map = {}
+    for item in patterns:
+        if isinstance(item, dict) and 'pattern' in item and 'response' in item:
+            response_map.setdefault(item['pattern'].lower().strip(), item['response'])
+    return patterns, tuple(response_map), response_map
+
+patterns_mtime = os.path.getmtime(PATTERNS_FILE) if os.path.exists(PATTERNS_FILE) else None
+patterns, lowered_patterns, response_map = load_patterns(patterns_mtime)
 
-patterns = load_patterns()
+# Local .streamlit/secrets.toml, parsed once per process with the stdlib TOML parser
+@st.cache_resource
+def _load_local_secrets():
+    try:
+        import tomllib
+        with open(".streamlit/secrets.toml", "rb") as file:
+            return tomllib.load(file)
+    except Exception:
+        return {}
+
+# Robust API Key Loading (cached so secrets/env/TOML lookups don't run on every rerun)
+@st.cache_data(ttl=3600)
+def _resolve_api_key():
+    # 1. Try Streamlit Secrets
+    api_key = None
+    try:
+        api_key = st.secrets.get("GEMINI_API_KEY")
+    except Exception:
+        pass
+
+    # 2. Try Environment Variable
+    if not api_key:
+        api_key = os.getenv("GEMINI_API_KEY")
+
+    # 3. Try Direct File Read (Local Fallback)
+    if not api_key:
+        api_key = _load_local_secrets().get("GEMINI_API_KEY")
+    return api_key
+
+# Configure Gemini once per process and share the model across sessions
+@st.cache_resource
+def get_gemini_model():
+    api_key = _resolve_api_key()
+    if not api_key:
+        # Raising keeps the missing-key case out of the resource cache
+        raise RuntimeError("GEMINI_API_KEY is not configured")
+    genai.configure(api_key=api_key)
+    # Use the Flash model for better rate limits
+    return genai.GenerativeModel('gemini-2.0-flash')
+
+# Client-side token bucket so bursts of Gemini requests wait for quota instead of failing with 429s
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate / 60.0  # tokens per second (rate is requests per minute)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+# One bucket per process, shared by every session (tuned to the Flash quota)
+@st.cache_resource
+def _gemini_bucket():
+    return TokenBucket(rate=60, capacity=10)
+
+# Prompt for Medium Length (Balanced) answers with Strict Legal Guardrails
+def _answer_prompt(query: str) -> str:
+    return f"""You are a specialized legal assistant for Indian law. 
+    Your task is to answer ONLY legal-related queries.
+    
+    Query: {query}
+    
+    Instructions:
+    1. If the query is NOT related to law, crime, rights, or legal procedures, reply EXACTLY: "I am a legal assistant. I can only help you with legal matters, laws, and rights in India."
+    2. If the query IS legal, provide a clear, balanced answer (4-5 sentences).
+    3. Mention key sections/acts but avoid overwhelming detail.
+    4. Always remind users to consult a lawyer."""
+
+# Prompt for the "Read Detailed Explanation" expander
+def _detailed_prompt(query: str) -> str:
+    return f"""You are an expert legal advisor.
+    Provide a comprehensive, detailed legal analysis of: {query}
+    Include:
+    1. Relevant Sections/Acts (IPC, CrPC, etc.)
+    2. Punishments/Fines
+    3. Legal Procedure/Steps
+    4. Rights of the involved parties
+    5. Important Case Laws (if any)
+    Format with clear headings and bullet points."""
+
+# Finished streamed responses, shared across sessions so repeat queries
+# are replayed instead of hitting the API again
+RESPONSE_CACHE_TTL = 3600
+RESPONSE_CACHE_MAX_ENTRIES = 500
+
+@st.cache_resource
+def _response_cache():
+    return {}, threading.Lock()
+
+def _cached_response(key):
+    cache, lock = _response_cache()
+    with lock:
+        entry = cache.get(key)
+    if entry and time.time() - entry[0] < RESPONSE_CACHE_TTL:
+        return entry[1]
+    return None
+
+def _store_response(key, text):
+    cache, lock = _response_cache()
+    with lock:
+        cache.pop(key, None)
+        cache[key] = (time.time(), text)
+        # Evict the oldest entries once the cache is full
+        while len(cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            cache.pop(next(iter(cache)))
+
+def stream_gemini(key, prompt):
+    """Yield Gemini output as it is generated (replayed from cache when available)"""
+    text = _cached_response(key)
+    if text is not None:
+        yield text
+        return
+
+    parts = []
+    _gemini_bucket().acquire()
+    for chunk in get_gemini_model().generate_content(prompt, stream=True):
+        parts.append(chunk.text)
+        yield chunk.text
+    _store_response(key, "".join(parts).strip())
+
+# Keyword fallbacks compiled into one alternation; the named group that matches
+# selects the response
+FALLBACK_RE = re.compile(
+    r'(?P<ipc>ipc|section)|(?P<lawyer>lawyer|attorney)|(?P<court>court)'
+    r'|(?P<rights>rights)|(?P<theft>robbery|theft|dacoity|roberry)'
+)
+FALLBACK_RESPONSES = {
+    "ipc": "The Indian Penal Code (IPC) is the main criminal code of India. Please specify which section you'd like to know about.",
+    "lawyer": "For specific legal advice, please consult a qualified lawyer or attorney in your area.",
+    "court": "Indian courts include District Courts, High Courts, and the Supreme Court. Each handles different types of cases.",
+    "rights": "Indian citizens have fundamental rights under the Constitution including right to equality, freedom, and justice.",
+    "theft": "Theft, Robbery, and Dacoity are offenses under the Indian Penal Code (Sections 378-402). Punishment varies based on severity. Report such incidents to the police immediately.",
+}
+
+# Re-emit a partially consumed response stream, recording the full answer
+# in the conversation context once it has been rendered. If the stream breaks
+# midway, the keyword answer is appended so the rerun still completes.
+def _with_context(query, first_chunk, response_stream):
+    parts = [first_chunk]
+    yield first_chunk
+    try:
+        for chunk in response_stream:
+            parts.append(chunk)
+            yield chunk
+    except Exception as e:
+        print(f"Gemini Error: {e}")
+        fallback = f"\n\n{_answer_for(st.session_state.language_preference, query, patterns_mtime)}"
+        parts.append(fallback)
+        yield fallback
+    st.session_state.conversation_context.append(f"Assistant: {''.join(parts).strip()}")
+
+# Local (non-AI) answer for a normalized query, cached across reruns so
+# repeated submissions skip the pattern scan and keyword matching
+# (keyed on the patterns file's mtime so edits to it are picked up)
+@st.cache_data(max_entries=256, show_spinner=False)
+def _answer_for(lang: str, q: str, patterns_mtime) -> str:
+    # Check for matching patterns
+    for pat in lowered_patterns:
+        if pat in q:
+            return response_map[pat]
+
+    # Fallback response with basic keyword matching
+    m = FALLBACK_RE.search(q)
+    return FALLBACK_RESPONSES[m.lastgroup] if m else load_translation(lang)["no_response"]
 
 # Define response function using Gemini API (Cloud Compatible)
 def get_response(query):
     query = query.lower().strip()
     if len(query) < 3:
-        return translations[st.session_state.language_preference]["no_response"]
+        return T["no_response"], False
 
     # Add the latest user query to the conversation context
     st.session_state.conversation_context.append(f"User: {query}")
@@ -105,117 +296,88 @@ def get_response(query):
     # Try to use Gemini API
     if GEMINI_AVAILABLE:
         try:
-            # Robust API Key Loading
-            api_key = None
-            # 1. Try Streamlit Secrets
-            if hasattr(st, 'secrets'):
-                api_key = st.secrets.get("GEMINI_API_KEY")
-            
-            # 2. Try Environment Variable
-            if not api_key:
-                api_key = os.getenv("GEMINI_API_KEY")
-
-            # 3. Try Direct File Read (Local Fallback)
-            if not api_key:
-                try:
-                    import toml
-                    secrets = toml.load(".streamlit/secrets.toml")
-                    api_key = secrets.get("GEMINI_API_KEY")
-                except:
-                    pass
-            
-            if api_key:
-                genai.configure(api_key=api_key)
-                # Use the Flash model for better rate limits
-                model = genai.GenerativeModel('gemini-2.0-flash')
-                
-                # Create prompt for Medium Length (Balanced) with Strict Legal Guardrails
-                prompt = f"""You are a specialized legal assistant for Indian law. 
-                Your task is to answer ONLY legal-related queries.
-                
-                Query: {query}
-                
-                Instructions:
-                1. If the query is NOT related to law, crime, rights, or legal procedures, reply EXACTLY: "I am a legal assistant. I can only help you with legal matters, laws, and rights in India."
-                2. If the query IS legal, provide a clear, balanced answer (4-5 sentences).
-                3. Mention key sections/acts but avoid overwhelming detail.
-                4. Always remind users to consult a lawyer."""
-                
-                response_obj = model.generate_content(prompt)
-                response = response_obj.text.strip()
-                if response:
-                    st.session_state.conversation_context.append(f"Assistant: {response}")
-                    return response, True  # Return True to indicate AI response (for Read More button)
+            if _resolve_api_key():
+                response_stream = stream_gemini(
+                    ("answer", st.session_state.language_preference, query), _answer_prompt(query)
+                )
+                # Pull the first chunk here so API errors still fall back to keywords
+                first_chunk = next(response_stream, "")
+                if first_chunk:
+                    # Return True to indicate AI response (for Read More button);
+                    # the caller renders the stream with st.write_stream
+                    return _with_context(query, first_chunk, response_stream), True
         except Exception as e:
             print(f"Gemini Error: {e}")
             # Don't show error to user, fall back to keywords
             pass
 
-    # Check for matching patterns only if patterns exist
-    if patterns and isinstance(patterns, list):
-        for item in patterns:
-            if isinstance(item, dict) and 'pattern' in item and 'response' in item:
-                pattern = item['pattern'].lower().strip()
-                if pattern in query:
-                    response = item['response']
-                    st.session_state.conversation_context.append(f"Assistant: {response}")
-                    return response, False
-
-    # Fallback response with basic keyword matching
-    if 'ipc' in query or 'section' in query:
-        response = "The Indian Penal Code (IPC) is the main criminal code of India. Please specify which section you'd like to know about."
-    elif 'lawyer' in query or 'attorney' in query:
-        response = "For specific legal advice, please consult a qualified lawyer or attorney in your area."
-    elif 'court' in query:
-        response = "Indian courts include District Courts, High Courts, and the Supreme Court. Each handles different types of cases."
-    elif 'rights' in query:
-        response = "Indian citizens have fundamental rights under the Constitution including right to equality, freedom, and justice."
-    elif 'robbery' in query or 'theft' in query or 'dacoity' in query or 'roberry' in query:
-        response = "Theft, Robbery, and Dacoity are offenses under the Indian Penal Code (Sections 378-402). Punishment varies based on severity. Report such incidents to the police immediately."
-    else:
-        response = translations[st.session_state.language_preference]["no_response"]
-    
+    response = _answer_for(st.session_state.language_preference, query, patterns_mtime)
     st.session_state.conversation_context.append(f"Assistant: {response}")
     return response, False
 
-def analyze_legal_document(document_text, document_name):
-    """Analyze legal document using Gemini API"""
-    
-    if not GEMINI_AVAILABLE:
-        return "❌ AI analysis not available. Please ensure Gemini API is configured."
-    
-    try:
-        # Get API key
-        api_key = None
-        if hasattr(st, 'secrets'):
-            api_key = st.secrets.get("GEMINI_API_KEY")
-        if not api_key:
-            api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            try:
-                import toml
-                secrets = toml.load(".streamlit/secrets.toml")
-                api_key = secrets.get("GEMINI_API_KEY")
-            except:
-                pass
-        
-        if not api_key:
-            return "❌ API key not configured. Please set up GEMINI_API_KEY in secrets."
-        
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Limit text length to avoid token limits (first 4000 characters)
-        text_sample = document_text[:4000] if len(document_text) > 4000 else document_text
-        
-        # Create detailed analysis prompt
-        prompt = f"""You are an expert legal document analyst specializing in Indian law.
+# Long documents are analyzed in overlapping chunks so nothing is dropped
+ANALYSIS_CHUNK_SIZE = 8000
+ANALYSIS_CHUNK_OVERLAP = 400
+ANALYSIS_MAX_WORKERS = 4
+# Upper bound on map calls per document; longer documents get larger chunks
+MAX_ANALYSIS_CHUNKS = 16
+
+def _chunk(text, size=ANALYSIS_CHUNK_SIZE, overlap=ANALYSIS_CHUNK_OVERLAP):
+    step = size - overlap
+    starts = range(0, max(len(text) - overlap, 1), step)
+    # A last chunk adding less new text than the overlap is folded into the
+    # one before it instead of costing a call of its own
+    if len(starts) > 1 and len(text) - starts[-1] - overlap < overlap:
+        starts = starts[:-1]
+    for start in starts[:-1]:
+        yield text[start:start + size]
+    yield text[starts[-1]:]
+
+# Extract the legally relevant points from one chunk (runs in worker threads)
+def _chunk_notes(model, bucket, document_name, index, total, chunk):
+    prompt = f"""You are an expert legal document analyst specializing in Indian law.
+You are reading part {index} of {total} of the document "{document_name}".
+
+Document Content (part {index} of {total}):
+{chunk}
+
+List, as concise bullet points, everything in this part that matters for a legal review:
+document type hints, parties, key clauses and terms, obligations, payment and termination terms,
+problematic or unfair clauses, protective provisions, and compliance concerns under Indian law.
+Only report what is in this part."""
+    bucket.acquire()
+    return model.generate_content(prompt).text
+
+# Full document analysis (map over chunks, then reduce); cached via analyze_cached
+def _gemini_analysis(document_text: str, document_name: str) -> str:
+    model = get_gemini_model()
+    bucket = _gemini_bucket()
+    # Grow the chunks rather than the number of calls once the cap is reached
+    size = max(ANALYSIS_CHUNK_SIZE, -(-len(document_text) // MAX_ANALYSIS_CHUNKS) + ANALYSIS_CHUNK_OVERLAP)
+    chunks = list(_chunk(document_text, size))
+
+    if len(chunks) == 1:
+        content_heading = "Document Content:"
+        content = chunks[0]
+    else:
+        # Map: summarize every chunk in parallel, then reduce with the full analysis prompt
+        total = len(chunks)
+        with ThreadPoolExecutor(max_workers=ANALYSIS_MAX_WORKERS) as executor:
+            notes = list(executor.map(
+                lambda args: _chunk_notes(model, bucket, document_name, args[0], total, args[1]),
+                enumerate(chunks, start=1),
+            ))
+        content_heading = f"Notes extracted from all {total} parts of the document:"
+        content = "\n\n".join(f"### Part {i}\n{note}" for i, note in enumerate(notes, start=1))
+
+    # Create detailed analysis prompt
+    prompt = f"""You are an expert legal document analyst specializing in Indian law.
 
 Document Name: {document_name}
 Document Length: {len(document_text)} characters
 
-Document Content:
-{text_sample}
+{content_heading}
+{content}
 
 Provide a comprehensive legal analysis in the following format:
 
@@ -246,149 +408,141 @@ Provide a comprehensive legal analysis in the following format:
 ---
 **Important Disclaimer:** This is an AI-generated analysis for informational purposes only. This does NOT constitute legal advice. Please consult a qualified lawyer for professional legal advice specific to your situation.
 """
+    
+    bucket.acquire()
+    response = model.generate_content(prompt)
+    if size > ANALYSIS_CHUNK_SIZE:
+        return (f"ℹ️ This document is long ({len(document_text):,} characters), so it was read in "
+                f"{len(chunks)} larger parts of up to {size:,} characters to limit API calls.\n\n{response.text}")
+    return response.text
+
+# Content hash of extracted text, used as the analysis cache key
+def _document_key(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+# Analysis per document text, persisted so re-analyzing skips the API calls
+# (failures raise and are therefore never cached)
+@st.cache_data(persist="disk", max_entries=200, show_spinner=False)
+def analyze_cached(key: str, _text: str, name: str) -> str:
+    return _gemini_analysis(_text, name)
+
+# Shared worker pool for background work (document extraction)
+@st.cache_resource
+def _background_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+def _extract_with_progress(uploaded_files, progress):
+    """Extract text of all documents on a worker thread, overlapping it with model setup"""
+    # process_documents caches extracted text on each file's content hash
+    future = _background_executor().submit(process_documents, uploaded_files)
+
+    # Get the Gemini model ready on another worker while extraction runs
+    # (analysis calls get_gemini_model again and reports any error itself)
+    if GEMINI_AVAILABLE and _resolve_api_key():
+        _background_executor().submit(get_gemini_model)
+
+    # Poll so the progress bar keeps moving during long extractions; it stops
+    # at 45%, after which only completion is waited for
+    percent = 0
+    while percent < 45 and not wait([future], timeout=0.2).done:
+        percent += 5
+        progress.progress(percent, text="Extracting text...")
+    return future.result()
+
+# Send one throwaway request per process in the background so connection and
+# auth setup are done before the first real query
+@st.cache_resource
+def _warm_gemini():
+    model = get_gemini_model()
+    bucket = _gemini_bucket()
+
+    def ping():
+        try:
+            bucket.acquire()
+            model.generate_content("ping")
+        except Exception as e:
+            print(f"Gemini warm-up failed: {e}")
+
+    return _background_executor().submit(ping)
+
+# Load OCR models per process in the background so the first scanned upload
+# doesn't wait for them
+@st.cache_resource
+def _warm_ocr():
+    return _background_executor().submit(warm_ocr_models)
+
+def analyze_legal_document(document_text, document_name):
+    """Analyze legal document using Gemini API"""
+    
+    if not GEMINI_AVAILABLE:
+        return "❌ AI analysis not available. Please ensure Gemini API is configured."
+    
+    try:
+        if not _resolve_api_key():
+            return "❌ API key not configured. Please set up GEMINI_API_KEY in secrets."
         
-        response = model.generate_content(prompt)
-        return response.text
+        return analyze_cached(_document_key(document_text.encode("utf-8")), document_text, document_name)
         
     except Exception as e:
         return f"❌ Analysis error: {str(e)}\n\nPlease try again or consult the error logs."
 
 
-# Language Translation Dictionary
-translations = {
-    "English": {
-        "ask_query": "Ask your query for legal assistance",
-        "thinking": "Thinking ✨...",
-        "no_response": "Sorry, I couldn't find a matching response for your query.",
-        "positive_feedback": "👍 Positive feedback",
-        "negative_feedback": "👎 Negative feedback",
-        "login_button": "Login",
-        "welcome": "Welcome",
-        "faq_button": "Show FAQs",
-        "download_button": "Download Chat History as CSV",
-        "interaction_history": "Show Interaction History",
-        "voice_query": "Voice Query 🎙️",
-        "view_history": "View History 📜",
-        "download_law": "Download Law 📁",
-        "info_section": "**Legal Laws Advisor Bot:📄**\n- **Objective:** Developed a conversational chatbot to provide legal law info and assistance.\n- **Features:**📜\n  - Allows users to ask their query of law.\n  - Provides a response to user query. ✔\n  - Offers a user-friendly interface for asking legal questions."
-    },
-    "Hindi - हिन्दी": {
-        "ask_query": "कानूनी सहायता के लिए अपना प्रश्न पूछें",
-        "thinking": "सोच रहे हैं ✨...",
-        "no_response": "मुझे आपके प्रश्न का मिलान करने वाला उत्तर नहीं मिला।",
-        "positive_feedback": "👍 सकारात्मक प्रतिक्रिया",
-        "negative_feedback": "👎 नकारात्मक प्रतिक्रिया",
-        "login_button": "लॉगिन करें",
-        "welcome": "स्वागत है",
-        "faq_button": "सामान्य प्रश्न दिखाएँ",
-        "download_button": "चैट इतिहास डाउनलोड करें",
-        "interaction_history": "इंटरएक्शन इतिहास दिखाएँ",
-        "voice_query": "आवाज़ से पूछें 🎙️",
-        "view_history": "इतिहास देखें 📜",
-        "download_law": "कानून डाउनलोड करें 📁",
-         "info_section": """
-        **कानूनी क़ानून सलाहकार बॉट📄**
-        - **लक्ष्य:** कानूनी क़ानून जानकारी और सहायता प्रदान करने के लिए एक संवादात्मक चैटबॉट विकसित किया गया।
-        - **विशेषताएँ:**📜
-          -  उपयोगकर्ताओं को कानून से संबंधित प्रश्न पूछने की अनुमति देता है। 𓍝
-          -  उपयोगकर्ता के प्रश्न का उत्तर प्रदान करता है। ✔
-          -  उपयोगकर्ता के प्रश्न का विस्तृत विवरण, दंड, लाभ, और हानियाँ प्रदर्शित करता है। ✉︎
-          -  कानूनी प्रश्न पूछने के लिए एक उपयोगकर्ता-मित्र इंटरफेस प्रदान करता है। 🔗
-        """
-    },
-    "Telugu - తెలుగు": {
-        "ask_query": "న్యాయ సహాయం కోసం మీ ప్రశ్నను అడగండి",
-        "thinking": "ఆలోచిస్తున్నాను ✨...",
-        "no_response": "మీ ప్రశ్నకు సరిపడే సమాధానం కనుగొనలేకపోయాను.",
-        "positive_feedback": "👍 సానుకూల అభిప్రాయం",
-        "negative_feedback": "👎 ప్రతికూల అభిప్రాయం",
-        "login_button": "లాగిన్ చేయండి",
-        "welcome": "స్వాగతం",
-        "faq_button": "ఎఫ్ ఏ క్యూ లను చూపించండి",
-        "download_button": "చాట్ చరిత్రను డౌన్‌లోడ్ చేయండి",
-        "interaction_history": "మాట్లాడిన చరిత్ర చూపించు",
-        "voice_query": "వాయిస్ క్వెరీ 🎙️",
-        "view_history": "చరిత్ర చూడండి 📜",
-        "download_law": "డౌన్‌లోడ్ చేయండి 📁",
-        "info_section": """
-        **చట్టాల సలహా బాట్📄**
-        - **ఉద్దేశం:** చట్టాల సమాచారం మరియు సహాయం అందించడానికి ఒక సంభాషణ చాట్‌బాట్‌ను అభివృద్ధి చేయడం।
-        - **ప్రతి పౌరుడు చట్టాల గురించి అవగాహన కలిగి ఉండాలి.
-        - **సదుపాయాలు:**📜
-          -  వినియోగదారులు చట్టం గురించి తమ ప్రశ్నను అడగగలుగుతారు। 𓍝
-          -  వినియోగదారుల ప్రశ్నకు సమాధానం అందిస్తుంది। ✔
-          -  వినియోగదారు ప్రశ్నకు సంబంధించిన వివరణ, శిక్షలు, లాభాలు మరియు నష్టాలను ప్రదర్శిస్తుంది। ✉︎
-          -  చట్టంపై ప్రశ్నలను అడగడానికి వినియోగదారు-అనుకూల ఇంటర్‌ఫేస్ అందిస్తుంది। 🔗
-        - **ప్రాముఖ్యత:** సంభాషణ కృత్రిమ నుణ్ణి గుణం ద్వారా చట్ట సమాచారాన్ని అందించే లోనిపడి సరళత, సామర్థ్యం మరియు యాక్సెస్‌పై దృష్టి సారిస్తుంది। 📝
-        """
-    },
-    "Tamil - தமிழ்": {
-        "ask_query":"சட்ட உதவிக்கு உங்கள் கேள்வியைக் கேளுங்கள்",
-        "thinking": "சிந்தித்து கொண்டிருக்கிறேன் ✨...",
-        "no_response": "உங்கள் கேள்விக்கான பதிலை காணவில்லை.",
-        "positive_feedback": "👍 நல்ல கருத்து",
-        "negative_feedback": "👎 எதிர்மறை கருத்து",
-        "login_button": "உள்நுழைய",
-        "welcome": "வரவேற்கிறேன்",
-        "faq_button": "கேள்விகளை காண்பிக்கவும்",
-        "download_button": "அரட்டை வரலாற்றைப் பதிவிறக்கவும்",
-        "interaction_history": "உரையாடல் வரலாற்றைக் காண்பிக்கவும்",
-        "voice_query": "குரல் கேள்வி 🎙️",
-        "view_history": "வரலாற்றைக் காண்க 📜",
-        "download_law": "சட்டத்தை பதிவிறக்கவும் 📁",
-        "info_section": """
-        **சட்ட ஆலோசகர்போட்📄**
-        - **நோக்கம்:** சட்ட தகவல்கள் மற்றும் உதவியை வழங்குவதற்காக உருவாக்கப்பட்ட ஒரு உரையாடல் சாட் பாட்டை உருவாக்கியது.
-        - **ஒவ்வொரு குடிமகனும் சட்டங்களைப் பற்றி அறிந்திருக்க வேண்டும்.**
-        - **சாதனைகள்:**📜
-          -  பயனாளர்களுக்கு சட்டம் பற்றிய கேள்விகளை கேட்க அனுமதிக்கின்றது। 𓍝
-          -  பயனாளரின் கேள்விக்கு பதில் அளிக்கின்றது। ✔
-          -  பயனாளரின் கேள்விக்கு தொடர்புடைய விளக்கம், தண்டனைகள், நன்மைகள் மற்றும் தீமைகளை காட்டுகின்றது। ✉︎
-          -  சட்டங்களைப் பற்றி கேட்க பயனாளர் நட்பான இடைமுகத்தை வழங்குகிறது। 🔗
-        - **முக்கியத்துவம்:** உரையாடல் செயற்கை நுண்ணறிவு வழியாக சட்ட தகவல்களை வழங்குவதில் எளிமை, திறன் மற்றும் அணுகுமுறை என்பதிலுள்ள கவனம். 📝
-        """
-    },
-    "Kannada - ಕನ್ನಡ": {
-    "ask_query": "ನಿಮ್ಮ ಕಾನೂನು ಸಹಾಯಕ್ಕಾಗಿ ಪ್ರಶ್ನೆಯನ್ನು ಕೇಳಿ",
-    "thinking": "ಆಲೋಚನೆ ✨...",
-    "no_response": "ಕ್ಷಮಿಸಿ, ನಿಮ್ಮ ಪ್ರಶ್ನೆಗೆ ಹೊಂದುವ ಉತ್ತರವನ್ನು ನಾನು ಕಂಡುಹಿಡಿಯಲಿಲ್ಲ.",
-    "positive_feedback": "👍 ಉತ್ತಮ ಪ್ರತಿಕ್ರಿಯೆ",
-    "negative_feedback": "👎 ಹೀನಾಯ ಪ್ರತಿಕ್ರಿಯೆ",
-    "login_button": "ಲಾಗಿನ್",
-    "welcome": "ಸ್ವಾಗತ",
-    "faq_button": "FAQಗಳನ್ನು ತೋರಿಸಿ",
-    "download_button": "ಚಾಟ್ ಇತಿಹಾಸವನ್ನು CSVಗೆ ಡೌನ್‌ಲೋಡ್ ಮಾಡಿ",
-    "interaction_history": "ಇಂಟರಾಕ್ಷನ್ ಇತಿಹಾಸವನ್ನು ತೋರಿಸಿ",
-    "voice_query": "ಧ್ವನಿ ಪ್ರಶ್ನೆ 🎙️",
-    "view_history": "ಇತಿಹಾಸ ವೀಕ್ಷಿಸಿ 📜",
-    "download_law": "ಕಾನೂನು ಡೌನ್‌ಲೋಡ್ ಮಾಡಿ 📁",
-    "info_section": "**ಕಾನೂನು ಸಲಹೆಗಾರ ಬಾಟ್:📄**\n- **ಉದ್ದೇಶ:** ಕಾನೂನು ಮಾಹಿತಿ ಮತ್ತು ಸಹಾಯ ನೀಡಲು ಸಂವಾದಾತ್ಮಕ ಚಾಟ್‌ಬಾಟ್ ಅನ್ನು ಅಭಿವೃದ್ಧಿಪಡಿಸಲಾಗಿದೆ.\n- **ವೈಶಿಷ್ಟ್ಯಗಳು:**📜\n  - ಬಳಕೆದಾರರಿಗೆ ಕಾನೂನು ಪ್ರಶ್ನೆಯನ್ನು ಕೇಳಲು ಅವಕಾಶ ನೀಡುತ್ತದೆ.\n  - ಬಳಕೆದಾರರ ಪ್ರಶ್ನೆಗೆ ಉತ್ತರವನ್ನು ನೀಡುತ್ತದೆ. ✔\n  - ಕಾನೂನು ಪ್ರಶ್ನೆಗಳನ್ನು ಕೇಳಲು ಬಳಕೆದಾರ-ಹಿತಕರ ಇಂಟರ್‌ಫೇಸ್ ಅನ್ನು ಒದಗಿಸುತ್ತದೆ."
-},
-    "Malayalam - മലയാളം": {
-    "ask_query": "നിങ്ങളുടെ നിയമ സഹായത്തിനായുള്ള ചോദ്യം ചോദിക്കുക",
-    "thinking": "ചിന്തിക്കുന്നു ✨...",
-    "no_response": "ക്ഷമിക്കണം, നിങ്ങളുടെ ചോദ്യത്തിന് അനുയോജമായ പ്രതികരണം കണ്ടെത്താനായില്ല.",
-    "positive_feedback": "👍 സാന്ദര്യപരമായ പ്രതികരണം",
-    "negative_feedback": "👎 പ്രതികൂല പ്രതികരണം",
-    "login_button": "ലോഗിൻ",
-    "welcome": "സ്വാഗതം",
-    "faq_button": "FAQ കാണിക്കുക",
-    "download_button": "ചാറ്റ് ചരിത്രം CSV ആയി ഡൗൺലോഡ് ചെയ്യുക",
-    "interaction_history": "ഇന്ററാക്ഷൻ ചരിത്രം കാണിക്കുക",
-    "voice_query": "ശബ്ദ ചോദ്യം 🎙️",
-    "view_history": "ചരിത്രം കാണുക 📜",
-    "download_law": "നിയമം ഡൗൺലോഡ് ചെയ്യുക 📁",
-    "info_section": "**നിയമ ഉപദേഷ്ടാവ് ബോട്ട്:📄**\n- **ലക്ഷ്യം:** നിയമ വിവരങ്ങളും സഹായവും നൽകാൻ സംഭാഷണ ചാറ്റ്‌ബോട്ട് വികസിപ്പിച്ചിരിക്കുന്നു.\n- **സവിശേഷതകൾ:**📜\n  - ഉപയോക്താക്കളെ നിയമ ചോദ്യങ്ങൾ ചോദിക്കാൻ അനുവദിക്കുന്നു.\n  - ഉപയോക്തൃ ചോദ്യത്തിന് പ്രതികരണം നൽകുന്നു. ✔\n  - നിയമ ചോദ്യങ്ങൾ ചോദിക്കാൻ ഉപയോക്തൃ സൗഹൃദ ഇന്റർഫേസ് നൽകുന്നു."
-}
+# Per-language UI strings live in i18n/<slug>.json and are loaded on demand
+LANG_SLUG = {
+    "English": "en",
+    "Hindi - हिन्दी": "hi",
+    "Telugu - తెలుగు": "te",
+    "Tamil - தமிழ்": "ta",
+    "Malayalam - മലയാളം": "ml",
+    "Kannada - ಕನ್ನಡ": "kn",
 }
 
+@st.cache_data
+def load_translation(lang: str) -> dict:
+    with open(f"i18n/{LANG_SLUG[lang]}.json", "r", encoding="utf8") as file:
+        return json.load(file)
 
+# Languages offered in the sidebar, with a name -> position lookup for the selectbox
+LANGUAGES = tuple(LANG_SLUG)
+LANG_INDEX = {name: i for i, name in enumerate(LANGUAGES)}
 
-# Streamlit Title
-st.title("AI-LEGAL LAWS ASSISTANT 🎗️")
 
-# Custom CSS for better UI/UX
-st.markdown("""
+# Upload limit for document analysis
+MAX_FILE_SIZE_MB = 10
+MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+
+# Folder where templates are stored
+TEMPLATES_FOLDER = "templates"
+
+# Legal templates with file names
+legal_templates = {
+    "Rental Agreement": "rental_agreement_template.pdf",
+    "Loan Agreement":"loan-agreement-template.pdf",
+    "Employment Agreement": "employment_agreement_template.pdf",
+    "Business Agreement": "partnership_agreement_template.pdf",
+    "Freelancer Agreement": "freelancer_contract_template.pdf",
+    "Invoice Agreement": "invoice_template.pdf",
+    "Lease Agreement": "lease_agreement_template.pdf",
+    "Service Agreement": "service_agreement_template.pdf",
+    "Non-Disclosure Agreement": "nda_template.pdf"  
+}
+
+# Templates present on disk, checked once per process instead of on every rerun
+@st.cache_resource
+def _available_templates():
+    return {name: path for name, file_name in legal_templates.items()
+            if (path := Path(TEMPLATES_FOLDER) / file_name).is_file()}
+
+# Template file contents, read once per process and shared by every download
+# (Streamlit needs bytes, so a mapping would still be copied on each click)
+@st.cache_resource
+def _template_bytes(file_path):
+    return file_path.read_bytes()
+
+# Custom CSS for the whole app (main layout, document analysis card, buttons).
+# Streamlit drops elements that aren't re-emitted, so this is still written on
+# every rerun, but as a single prebuilt string instead of three blocks.
+_CSS = """
 <style>
     /* Main container */
     .main {
@@ -428,14 +582,62 @@ st.markdown("""
         padding-top: 2rem;
         padding-bottom: 2rem;
     }
+
+    /* Document analysis card */
+    .analysis-card {
+        background: white;
+        padding: 15px;
+        border-radius: 10px;
+        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        margin: 15px 0;
+    }
+    
+    .analysis-header {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 10px 15px;
+        border-radius: 10px 10px 0 0;
+        margin: -15px -15px 10px -15px;
+    }
+
+    /* Buttons */
+    .stButton>button {
+        border: 2px solid #4CAF50;
+        border-radius: 8px;
+        background-color: #4CAF50;
+        color: #FFFFFF;
+        padding: 10px 15px;
+        font-size: 14px;
+        font-weight: 600;
+        margin: 5px;
+        cursor: pointer;
+        transition: all 0.3s ease;
+    }
+
+    .stButton>button:hover {
+        background-color: #45a049;
+        color: #FFFFFF;
+        transform: translateY(-2px);
+        box-shadow: 0 4px 8px rgba(0,0,0,0.2);
+    }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Load and display the info section
-st.info(translations[st.session_state.language_preference]["info_section"])
+# Warm up Gemini as soon as the app loads
+if GEMINI_AVAILABLE and _resolve_api_key():
+    try:
+        _warm_gemini()
+    except Exception as e:
+        print(f"Gemini Error: {e}")
 
-# Small disclaimer
-st.caption("⚠️ Disclaimer: This is an AI assistant providing general legal information only, not legal advice. Consult a qualified lawyer for specific legal matters.")
+if DOCUMENT_PROCESSING_AVAILABLE:
+    _warm_ocr()
+
+# Streamlit Title
+st.title("AI-LEGAL LAWS ASSISTANT 🎗️")
+
+# Custom CSS for better UI/UX (one injection per rerun)
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Sidebar - Features at top
 st.sidebar.title("✨ Features")
@@ -444,14 +646,23 @@ st.sidebar.markdown("---")
 # Language selection from the sidebar
 language_preference = st.sidebar.selectbox(
     "Welcome Select your preferred language :",
-    ["English", "Hindi - हिन्दी", "Telugu - తెలుగు", "Tamil - தமிழ்","Malayalam - മലയാളം","Kannada - ಕನ್ನಡ"],
-    index=["English", "Hindi - हिन्दी", "Telugu - తెలుగు", "Tamil - தமிழ்","Malayalam - മലയാളം","Kannada - ಕನ್ನಡ"].index(st.session_state.language_preference)
+    LANGUAGES,
+    index=LANG_INDEX[st.session_state.language_preference]
 )
 
 # Save selected language preference in session state
 if language_preference != st.session_state.language_preference:
     st.session_state.language_preference = language_preference
 
+# Translations for the active language, looked up once per rerun
+T = load_translation(st.session_state.language_preference)
+
+# Load and display the info section
+st.info(T["info_section"])
+
+# Small disclaimer
+st.caption("⚠️ Disclaimer: This is an AI assistant providing general legal information only, not legal advice. Consult a qualified lawyer for specific legal matters.")
+
 # User login logic
 if not st.session_state.user_logged_in:
     st.session_state.username = st.text_input("Enter your name to start chatting with legal laws assistant 🎗️")
@@ -466,7 +677,6 @@ if 'show_doc_analysis' not in st.session_state:
 # Show document analysis if button was clicked - APPEARS FIRST
 if st.session_state.show_doc_analysis:
     # Auto-scroll to top using Streamlit components (more reliable)
-    import streamlit.components.v1 as components
     components.html(
         """
         <script>
@@ -478,107 +688,96 @@ if st.session_state.show_doc_analysis:
     
     st.markdown("---")
     
-    # Custom CSS for document analysis section
-    st.markdown("""
-    <style>
-        .analysis-card {
-            background: white;
-            padding: 15px;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            margin: 15px 0;
-        }
-        
-        .analysis-header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 10px 15px;
-            border-radius: 10px 10px 0 0;
-            margin: -15px -15px 10px -15px;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Header
     st.markdown("## 📄 Document Analysis")
     st.markdown("Upload your legal documents for AI-powered analysis")
     
-    # File uploader
-    MAX_FILE_SIZE_MB = 10
-    MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
-    
-    col_upload, col_info = st.columns([3, 1])
+    # File uploader and Analyze button share a form, so picking a file
+    # doesn't rerun the app until the user submits
+    with st.form("doc_analysis_form", border=False):
+        col_upload, col_info = st.columns([3, 1])
     
-    with col_upload:
-        uploaded_file = st.file_uploader(
-            "Choose document",
-            type=['pdf', 'docx', 'doc'],
-            help=f"PDF or Word files, max {MAX_FILE_SIZE_MB}MB",
-            key="doc_analyzer"
-        )
+        with col_upload:
+            uploaded_files = st.file_uploader(
+                "Choose documents",
+                type=['pdf', 'docx', 'doc', 'png', 'jpg', 'jpeg'],
+                accept_multiple_files=True,
+                help=f"PDF, Word or image files, max {MAX_FILE_SIZE_MB}MB each",
+                key="doc_analyzer"
+            )
     
-    with col_info:
-        st.info("**Supported:**\n- 📕 PDF\n- 📘 Word\n- 🔒 Private")
+        with col_info:
+            st.info("**Supported:**\n- 📕 PDF\n- 📘 Word\n- 🖼️ Image\n- 🔒 Private")
+        analyze_clicked = st.form_submit_button("🔍 Analyze", type="primary", use_container_width=True)
     
-    if uploaded_file is not None:
-        # File size check
-        if uploaded_file.size > MAX_FILE_SIZE_BYTES:
-            st.error(f"⚠️ File too large ({uploaded_file.size / (1024*1024):.1f}MB). Max: {MAX_FILE_SIZE_MB}MB")
-        else:
-            # Compact file info
-            file_info = get_file_info(uploaded_file) if DOCUMENT_PROCESSING_AVAILABLE else {'name': uploaded_file.name, 'size_kb': uploaded_file.size / 1024}
-            
-            col1, col2, col3 = st.columns([2, 1, 1])
-            with col1:
-                st.success(f"✅ **{file_info['name'][:30]}...**" if len(file_info['name']) > 30 else f"✅ **{file_info['name']}**")
-            with col2:
-                st.metric("Size", f"{file_info['size_kb']:.1f} KB")
-            with col3:
-                analyze_clicked = st.button("🔍 Analyze", type="primary", use_container_width=True)
-            
-            # Analysis happens OUTSIDE columns for full width display
-            if analyze_clicked:
-                if not DOCUMENT_PROCESSING_AVAILABLE:
-                    st.error("❌ Install required libraries")
-                else:
-                    with st.spinner("🤖 Analyzing..."):
-                        # Extract text
-                        progress = st.progress(0, text="Extracting text...")
-                        document_text = process_document(uploaded_file)
-                        progress.progress(50, text="Analyzing with AI...")
-                        
-                        if "Error" in document_text or "not yet implemented" in document_text:
-                            progress.empty()
-                            st.error(f"❌ {document_text}")
-                        else:
-                            # AI Analysis
-                            analysis = analyze_legal_document(document_text, uploaded_file.name)
-                            progress.progress(100, text="Complete!")
-                            progress.empty()
-                            
-                            # Display in styled card at FULL WIDTH
-                            st.markdown('<div class="analysis-card">', unsafe_allow_html=True)
-                            st.markdown('<div class="analysis-header"><h3 style="margin:0; color:white;">🎯 Analysis Results</h3></div>', unsafe_allow_html=True)
-                            
-                            # Display analysis with better formatting
-                            st.markdown(analysis)
-                            
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                            # Compact download in expander
-                            with st.expander("📥 Download Report"):
-                                analysis_report = f"""LEGAL DOCUMENT ANALYSIS
+    if analyze_clicked and not uploaded_files:
+        st.warning("Please choose a document to analyze.")
+    elif analyze_clicked:
+        # File size check; files sharing a name are still analyzed separately
+        files = []
+        for uploaded_file in uploaded_files:
+            if uploaded_file.size > MAX_FILE_SIZE_BYTES:
+                st.error(f"⚠️ {uploaded_file.name} is too large ({uploaded_file.size / (1024*1024):.1f}MB). Max: {MAX_FILE_SIZE_MB}MB")
+            else:
+                files.append(uploaded_file)
+        
+        # Analysis happens OUTSIDE columns for full width display
+        if not DOCUMENT_PROCESSING_AVAILABLE:
+            st.error("❌ Install required libraries")
+        elif files:
+            with st.spinner("🤖 Analyzing..."):
+                # Extract text of every file in one batch
+                progress = st.progress(0, text="Extracting text...")
+                documents = _extract_with_progress(files, progress)
+                progress.progress(50, text="Analyzing with AI...")
+                
+                for i, (uploaded_file, (document_text, notice, error)) in enumerate(zip(files, documents)):
+                    
+                    # Compact file info
+                    file_info = get_file_info(uploaded_file)
+                    
+                    col1, col2 = st.columns([2, 1])
+                    with col1:
+                        st.success(f"✅ **{file_info['name'][:30]}...**" if len(file_info['name']) > 30 else f"✅ **{file_info['name']}**")
+                    with col2:
+                        st.metric("Size", f"{file_info['size_kb']:.1f} KB")
+                    
+                    if error:
+                        st.error(f"❌ {error}")
+                        continue
+                    if notice:
+                        st.warning(f"⚠️ {notice}")
+                    
+                    # AI Analysis
+                    analysis = analyze_legal_document(document_text, uploaded_file.name)
+                    
+                    # Display in styled card at FULL WIDTH
+                    st.markdown('<div class="analysis-card">', unsafe_allow_html=True)
+                    st.markdown('<div class="analysis-header"><h3 style="margin:0; color:white;">🎯 Analysis Results</h3></div>', unsafe_allow_html=True)
+                    
+                    # Display analysis with better formatting
+                    st.markdown(analysis)
+                    
+                    st.markdown('</div>', unsafe_allow_html=True)
+                    
+                    # Compact download in expander
+                    with st.expander("📥 Download Report"):
+                        analysis_report = f"""LEGAL DOCUMENT ANALYSIS
 Document: {uploaded_file.name}
 Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}
 
 {analysis}
 """
-                                st.download_button(
-                                    "Download TXT",
-                                    analysis_report,
-                                    f"analysis_{uploaded_file.name.rsplit('.', 1)[0]}.txt",
-                                    use_container_width=True
-                                )
+                        st.download_button(
+                            "Download TXT",
+                            analysis_report,
+                            f"analysis_{uploaded_file.name.rsplit('.', 1)[0]}.txt",
+                            use_container_width=True,
+                            key=f"download_report_{i}"
+                        )
+                
+                progress.progress(100, text="Complete!")
+                progress.empty()
     
     st.markdown("---")
     # After document analysis, show login prompt if not logged in
@@ -588,102 +787,66 @@ Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}
 
 # Chat section (only shows after login)
 if st.session_state.user_logged_in:
-    st.write(f"👋 Hello {st.session_state.username}! {translations[st.session_state.language_preference]['ask_query']}")
+    st.write(f"👋 Hello {st.session_state.username}! {T['ask_query']}")
     
     # Chat section continues below
-    prompt = st.chat_input(translations[st.session_state.language_preference]["ask_query"])
+    prompt = st.chat_input(T["ask_query"])
 
     if prompt:
         st.write(f"👤 Your Query: {prompt}")
         response, is_ai_generated = get_response(prompt)
-        st.write(f"🤖 Response: {response}")
+        if is_ai_generated:
+            st.write("🤖 Response:")
+            response = st.write_stream(response)
+        else:
+            st.write(f"🤖 Response: {response}")
 
         # Read More / Detailed View
         if is_ai_generated:
             with st.expander("📖 Read Detailed Explanation"):
-                with st.spinner("Generating detailed legal analysis..."):
-                    try:
-                        # Re-use the configured model to generate a detailed response
-                        model = genai.GenerativeModel('gemini-2.0-flash')
-                        detailed_prompt = f"""You are an expert legal advisor.
-                        Provide a comprehensive, detailed legal analysis of: {prompt}
-                        Include:
-                        1. Relevant Sections/Acts (IPC, CrPC, etc.)
-                        2. Punishments/Fines
-                        3. Legal Procedure/Steps
-                        4. Rights of the involved parties
-                        5. Important Case Laws (if any)
-                        Format with clear headings and bullet points."""
-                        
-                        detailed_response = model.generate_content(detailed_prompt)
-                        st.markdown(detailed_response.text)
-                    except Exception as e:
-                        st.error("Could not generate detailed explanation.")
-
-        new_log = {"user_query": prompt, "assistant_response": response}
-        st.session_state.interaction_log = pd.concat(
-            [st.session_state.interaction_log, pd.DataFrame([new_log])], ignore_index=True
-        )
+                try:
+                    st.write_stream(stream_gemini(("detailed", prompt), _detailed_prompt(prompt)))
+                except Exception as e:
+                    st.error("Could not generate detailed explanation.")
+
+        st.session_state.interaction_log_rows.append({"user_query": prompt, "assistant_response": response})
        
         # Speak the response if voice is enabled (optional, currently manual button)
         # speak(response)
 
- # Adding custom styling for buttons
-st.markdown("""
-    <style>
-        .stButton>button {
-            border: 2px solid #4CAF50;
-            border-radius: 8px;
-            background-color: #4CAF50;
-            color: #FFFFFF;
-            padding: 10px 15px;
-            font-size: 14px;
-            font-weight: 600;
-            margin: 5px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .stButton>button:hover {
-            background-color: #45a049;
-            color: #FFFFFF;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        }
-    </style>
-""", unsafe_allow_html=True)        
-
 # Create 3 columns for the buttons
 col1, col2, col3 = st.columns(3)
 
-# Speech to Text Button (disabled on cloud)
+# Speech to Text (recorded in the browser, so it also works on cloud deployments)
 with col1:
-    # Check if running on Streamlit Cloud (no microphone access)
-    is_cloud = os.getenv('STREAMLIT_SHARING_MODE') or not engine
-    
-    if is_cloud:
-        st.button(translations[st.session_state.language_preference]["voice_query"], disabled=True, help="Voice features are not available on cloud deployment")
-    else:
-        if st.button(translations[st.session_state.language_preference]["voice_query"]):
-            query = listen()
-            if query:
-                st.session_state.messages.append(query)
-                st.write(f"Your Query: {query}")
-                response, _ = get_response(query)  # Unpack tuple, ignore is_ai flag for voice
+    voice_audio = st.audio_input(T["voice_query"])
+
+    # The widget keeps its recording across reruns; only answer a new one
+    if voice_audio is not None and voice_audio.file_id != st.session_state.get("last_voice_id"):
+        st.session_state.last_voice_id = voice_audio.file_id
+        query = listen(voice_audio)
+        if query:
+            st.session_state.messages.append(query)
+            st.write(f"Your Query: {query}")
+            response, is_ai_generated = get_response(query)
+            if is_ai_generated:
+                st.write("Assistant Response:")
+                response = st.write_stream(response)
+            else:
                 st.write(f"Assistant Response: {response}")
-                speak(response)  # Speak the response
+            speak(response)  # Speak the response
 
 # Interaction History Button
 with col2:
-    if st.button(translations[st.session_state.language_preference]["view_history"]):
-        st.dataframe(st.session_state.interaction_log)
+    if st.button(T["view_history"]):
+        st.dataframe(pd.DataFrame(st.session_state.interaction_log_rows, columns=["user_query", "assistant_response"]))
 
 # Download Button
 with col3:
-    if st.button(translations[st.session_state.language_preference]["download_law"]):
+    if st.button(T["download_law"]):
         st.download_button(
-            translations[st.session_state.language_preference]["download_button"],
-            st.session_state.interaction_log.to_csv(index=False),
+            T["download_button"],
+            pd.DataFrame(st.session_state.interaction_log_rows, columns=["user_query", "assistant_response"]).to_csv(index=False),
             file_name="interaction_history.csv"
         )
 
@@ -696,92 +859,85 @@ def show_document_analyzer():
     """Document analysis in a modal dialog"""
     st.markdown("Upload your legal documents for AI-powered analysis")
     
-    # File uploader
-    MAX_FILE_SIZE_MB = 10
-    MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+    # File uploader and Analyze button share a form, so picking a file
+    # doesn't rerun the app until the user submits
+    with st.form("doc_analysis_modal_form", border=False):
+        col_upload, col_info = st.columns([3, 1])
     
-    col_upload, col_info = st.columns([3, 1])
+        with col_upload:
+            uploaded_files = st.file_uploader(
+                "Choose documents",
+                type=['pdf', 'docx', 'doc', 'png', 'jpg', 'jpeg'],
+                accept_multiple_files=True,
+                help=f"PDF, Word or image files, max {MAX_FILE_SIZE_MB}MB each",
+                key="doc_analyzer_modal"
+            )
     
-    with col_upload:
-        uploaded_file = st.file_uploader(
-            "Choose document",
-            type=['pdf', 'docx', 'doc'],
-            help=f"PDF or Word files, max {MAX_FILE_SIZE_MB}MB",
-            key="doc_analyzer_modal"
-        )
+        with col_info:
+            st.info("**Supported:**\n- 📕 PDF\n- 📘 Word\n- 🖼️ Image\n- 🔒 Private")
+        analyze_clicked = st.form_submit_button("🔍 Analyze", type="primary", use_container_width=True)
     
-    with col_info:
-        st.info("**Supported:**\n- 📕 PDF\n- 📘 Word\n- 🔒 Private")
-    
-    if uploaded_file is not None:
-        if uploaded_file.size > MAX_FILE_SIZE_BYTES:
-            st.error(f"⚠️ File too large ({uploaded_file.size / (1024*1024):.1f}MB). Max: {MAX_FILE_SIZE_MB}MB")
-        else:
-            file_info = get_file_info(uploaded_file) if DOCUMENT_PROCESSING_AVAILABLE else {'name': uploaded_file.name, 'size_kb': uploaded_file.size / 1024}
-            
-            col1, col2, col3 = st.columns([2, 1, 1])
-            with col1:
-                st.success(f"✅ **{file_info['name'][:30]}...**" if len(file_info['name']) > 30 else f"✅ **{file_info['name']}**")
-            with col2:
-                st.metric("Size", f"{file_info['size_kb']:.1f} KB")
-            with col3:
-                analyze_clicked = st.button("🔍 Analyze", type="primary", use_container_width=True, key="analyze_modal_btn")
-            
-            if analyze_clicked:
-                if not DOCUMENT_PROCESSING_AVAILABLE:
-                    st.error("❌ Install required libraries")
-                else:
-                    with st.spinner("🤖 Analyzing..."):
-                        progress = st.progress(0, text="Extracting text...")
-                        document_text = process_document(uploaded_file)
-                        progress.progress(50, text="Analyzing with AI...")
-                        
-                        if "Error" in document_text or "not yet implemented" in document_text:
-                            progress.empty()
-                            st.error(f"❌ {document_text}")
-                        else:
-                            analysis = analyze_legal_document(document_text, uploaded_file.name)
-                            progress.progress(100, text="Complete!")
-                            progress.empty()
-                            
-                            st.markdown("### 🎯 Analysis Results")
-                            st.markdown(analysis)
-                            
-                            with st.expander("📥 Download Report"):
-                                analysis_report = f"""LEGAL DOCUMENT ANALYSIS
+    if analyze_clicked and not uploaded_files:
+        st.warning("Please choose a document to analyze.")
+    elif analyze_clicked:
+        files = []
+        for uploaded_file in uploaded_files:
+            if uploaded_file.size > MAX_FILE_SIZE_BYTES:
+                st.error(f"⚠️ {uploaded_file.name} is too large ({uploaded_file.size / (1024*1024):.1f}MB). Max: {MAX_FILE_SIZE_MB}MB")
+            else:
+                files.append(uploaded_file)
+        
+        if not DOCUMENT_PROCESSING_AVAILABLE:
+            st.error("❌ Install required libraries")
+        elif files:
+            with st.spinner("🤖 Analyzing..."):
+                progress = st.progress(0, text="Extracting text...")
+                documents = _extract_with_progress(files, progress)
+                progress.progress(50, text="Analyzing with AI...")
+                
+                for i, (uploaded_file, (document_text, notice, error)) in enumerate(zip(files, documents)):
+                    file_info = get_file_info(uploaded_file)
+                    
+                    col1, col2 = st.columns([2, 1])
+                    with col1:
+                        st.success(f"✅ **{file_info['name'][:30]}...**" if len(file_info['name']) > 30 else f"✅ **{file_info['name']}**")
+                    with col2:
+                        st.metric("Size", f"{file_info['size_kb']:.1f} KB")
+                    
+                    if error:
+                        st.error(f"❌ {error}")
+                        continue
+                    if notice:
+                        st.warning(f"⚠️ {notice}")
+                    
+                    analysis = analyze_legal_document(document_text, uploaded_file.name)
+                    
+                    st.markdown("### 🎯 Analysis Results")
+                    st.markdown(analysis)
+                    
+                    with st.expander("📥 Download Report"):
+                        analysis_report = f"""LEGAL DOCUMENT ANALYSIS
 Document: {uploaded_file.name}
 Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}
 
 {analysis}
 """
-                                st.download_button(
-                                    "Download TXT",
-                                    analysis_report,
-                                    f"analysis_{uploaded_file.name.rsplit('.', 1)[0]}.txt",
-                                    use_container_width=True
-                                )
+                        st.download_button(
+                            "Download TXT",
+                            analysis_report,
+                            f"analysis_{uploaded_file.name.rsplit('.', 1)[0]}.txt",
+                            use_container_width=True,
+                            key=f"download_report_modal_{i}"
+                        )
+                
+                progress.progress(100, text="Complete!")
+                progress.empty()
 
 if st.sidebar.button("Open Document Analyzer", use_container_width=True, type="primary"):
     show_document_analyzer()
 
 
 # Templates section continues below
-# Folder where templates are stored
-TEMPLATES_FOLDER = "templates"
-
-# Legal templates with file names
-legal_templates = {
-    "Rental Agreement": "rental_agreement_template.pdf",
-    "Loan Agreement":"loan-agreement-template.pdf",
-    "Employment Agreement": "employment_agreement_template.pdf",
-    "Business Agreement": "partnership_agreement_template.pdf",
-    "Freelancer Agreement": "freelancer_contract_template.pdf",
-    "Invoice Agreement": "invoice_template.pdf",
-    "Lease Agreement": "lease_agreement_template.pdf",
-    "Service Agreement": "service_agreement_template.pdf",
-    "Non-Disclosure Agreement": "nda_template.pdf"  
-}
-
 # Sidebar for Language Selection (now for templates)
 with st.sidebar:
     # Language selection dropdown for templates with placeholder
@@ -801,19 +957,16 @@ with st.sidebar:
 
 # Get the selected template's file name
 if template_selection != "Select a template":  # Ensure a valid selection is made
-    selected_template_file = legal_templates.get(template_selection)
-
-    # Check if the selected template file exists and provide the download button
-    if selected_template_file:
-        file_path = os.path.join(TEMPLATES_FOLDER, selected_template_file)
-        
-        if os.path.exists(file_path):  # Check if the file exists
-            with open(file_path, "rb") as file:
-                st.sidebar.download_button(
-                    label=f"📄 Download {template_selection}",
-                    data=file,
-                    file_name=selected_template_file,
-                    mime="application/pdf"
-                )
-        else:
-            st.sidebar.warning(f"Template '{template_selection}' is not available.")
+    file_path = _available_templates().get(template_selection)
+
+    # Provide the download button if the selected template file exists
+    if file_path:
+        st.sidebar.download_button(
+            label=f"📄 Download {template_selection}",
+            # Deferred: bytes are produced only when the button is clicked
+            data=partial(_template_bytes, file_path),
+            file_name=file_path.name,
+            mime="application/pdf"
+        )
+    else:
+        st.sidebar.warning(f"Template '{template_selection}' is not available.")
@@ -3,61 +3,336 @@ Document Processor Module
 Handles text extraction from various document formats (PDF, DOCX, Images)
 """
 
-import PyPDF2
-from docx import Document
-from PIL import Image
+import functools
+import hashlib
+import importlib.util
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pymupdf
+import streamlit as st
+from lxml import etree
+from PIL import Image, ImageSequence
 import io
 
+# Optional in-process OCR (binds libtesseract directly, no subprocess per image)
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+
+# Optional OCR for scanned PDFs (GPU-accelerated when CUDA is available).
+# Only probed here: importing easyocr pulls in torch, so that waits for first use
+PDF_OCR_AVAILABLE = importlib.util.find_spec("easyocr") is not None
+
+
+# PyMuPDF is not thread-safe and extraction runs on a pool shared by all
+# sessions, so every PyMuPDF call is made while holding this lock
+_PYMUPDF_LOCK = threading.Lock()
+
+
+# Size limits per document: longer PDFs are rejected up front, and DOCX text
+# stops after this many paragraphs (with a notice)
+MAX_PAGES = 500
+MAX_PARAS = 20000
+
+
+class IncompleteExtraction(Exception):
+    """Extraction stopped short; carries the text recovered so far and a notice for the user"""
+
+    def __init__(self, text, notice):
+        super().__init__(notice)
+        self.text = text
+        self.notice = notice
+
+
+class TruncatedExtraction(IncompleteExtraction):
+    """Extraction stopped at a fixed size limit; the same file always stops at the same point"""
+
+
+# Pages yielding less text than this are treated as graphics-only (stamps,
+# signature blocks, outlined fonts) and contribute nothing
+MIN_PAGE_TEXT_CHARS = 3
+
 
-def extract_text_from_pdf(file):
-    """Extract text from PDF file"""
+def _join_text(parts):
+    """Join text parts with newlines, trimming the ends without a final strip() copy"""
+    # Blank parts at either end would leave stray newlines behind
+    start, stop = 0, len(parts)
+    while start < stop and (not parts[start] or parts[start].isspace()):
+        start += 1
+    while stop > start and (not parts[stop - 1] or parts[stop - 1].isspace()):
+        stop -= 1
+    parts = parts[start:stop]
+    if parts:
+        parts[0] = parts[0].lstrip()
+        parts[-1] = parts[-1].rstrip()
+    return "\n".join(parts)
+
+
+def _page_text(page):
+    """Extract the text of a single PDF page"""
+    # Build the page's layout once, text only; image blocks are never created
+    tp = page.get_textpage(flags=pymupdf.TEXTFLAGS_TEXT)
+    text = tp.extractText()
+    tp = None
+    return text if len(text.strip()) >= MIN_PAGE_TEXT_CHARS else ""
+
+
+# PDFs averaging less text per page than this are treated as scanned and OCR'd
+OCR_MIN_CHARS_PER_PAGE = 50
+OCR_DPI = 200
+OCR_BATCH_SIZE = 8
+# OCR covers at most this many pages and stops starting new batches after
+# this many seconds; whatever was recognized by then is returned with a notice
+OCR_MAX_PAGES = 50
+OCR_TIME_LIMIT = 120
+
+
+@st.cache_resource(show_spinner=False)
+def get_ocr_reader():
+    """Load the EasyOCR model once per process"""
+    import easyocr
+    import torch
+    # Inference on a shared reader is serialized with the returned lock
+    return easyocr.Reader(['en'], gpu=torch.cuda.is_available()), threading.Lock()
+
+
+def _page_image(page):
+    """Rasterize a PDF page to an RGB array for OCR"""
+    pix = page.get_pixmap(dpi=OCR_DPI)
+    image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+    pix = None  # samples is a copy; free the raster buffer right away
+    return image
+
+
+def _ocr_pdf(data):
+    """
+    OCR the pages of a scanned PDF, a batch of rasterized pages at a time.
+    Returns the text and the number of pages it covers.
+    """
+    reader, lock = get_ocr_reader()
+    deadline = time.monotonic() + OCR_TIME_LIMIT
+    texts = []
+    size = None
+    with _PYMUPDF_LOCK:
+        doc = pymupdf.open(stream=data, filetype="pdf")
+        page_count = min(doc.page_count, OCR_MAX_PAGES)
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        return f"Error extracting PDF: {str(e)}"
+        for start in range(0, page_count, OCR_BATCH_SIZE):
+            if time.monotonic() > deadline:
+                break
+            # Only rasterizing holds the PyMuPDF lock, not recognition
+            with _PYMUPDF_LOCK:
+                images = [_page_image(doc.load_page(i))
+                          for i in range(start, min(start + OCR_BATCH_SIZE, page_count))]
+            # Batched detection needs equally sized inputs; pages are scaled to the first one
+            size = size or (images[0].shape[1], images[0].shape[0])
+            with lock:
+                results = reader.readtext_batched(images, n_width=size[0], n_height=size[1],
+                                                  batch_size=OCR_BATCH_SIZE, detail=0)
+            images = None
+            texts.extend("\n".join(lines) for lines in results)
+    finally:
+        with _PYMUPDF_LOCK:
+            doc.close()
+    return _join_text(texts), len(texts)
 
 
-def extract_text_from_docx(file):
-    """Extract text from DOCX file"""
+def extract_text_from_pdf(data):
+    """Extract text from PDF bytes"""
+    # Opened from the in-memory upload (no file-like reads); MuPDF repairs
+    # damaged xref tables on open rather than rejecting the file
+    with _PYMUPDF_LOCK, pymupdf.open(stream=data, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if page_count > MAX_PAGES:
+            raise ValueError(f"document too long ({page_count} pages); please upload at most {MAX_PAGES} pages.")
+        # Pages are read one after another: PyMuPDF is not thread-safe, and
+        # worker processes cost more to start than they save at upload sizes
+        texts = [_page_text(page) for page in doc]
+    text = _join_text(texts)
+    # Born-digital PDFs never reach OCR; only near-empty (scanned) ones do
+    if len(text) >= OCR_MIN_CHARS_PER_PAGE * page_count:
+        return text
+    # Anything short of a full OCR pass raises, so it stays out of the
+    # persisted cache and is retried on the next upload
+    if not PDF_OCR_AVAILABLE:
+        raise IncompleteExtraction(text, "This looks like a scanned PDF, but OCR is not installed (easyocr); only its embedded text was read.")
     try:
-        doc = Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        ocr_text, ocr_pages = _ocr_pdf(data)
     except Exception as e:
-        return f"Error extracting DOCX: {str(e)}"
+        print(f"OCR Error: {e}")
+        raise IncompleteExtraction(text, f"OCR failed ({e}); only the embedded text of this scanned PDF was read.") from e
+    text = ocr_text or text
+    if ocr_pages < min(page_count, OCR_MAX_PAGES):
+        raise IncompleteExtraction(text, f"OCR stopped after {ocr_pages} of {page_count} pages ({OCR_TIME_LIMIT} s limit); the analysis covers those pages only.")
+    if ocr_pages < page_count:
+        # The page cap is deterministic, so this result may be cached
+        raise TruncatedExtraction(text, f"OCR covered the first {ocr_pages} of {page_count} pages ({OCR_MAX_PAGES}-page limit); the analysis covers those pages only.")
+    return text
 
 
-def extract_text_from_image(file):
-    """Placeholder for image OCR - to be implemented with pytesseract"""
+DOCX_NS = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+}
+_W = "{%s}" % DOCX_NS["w"]
+
+# Run content other than w:t that python-docx renders as text
+_DOCX_RUN_TEXT = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+# Every paragraph once, including tables and text boxes; mc:Fallback repeats
+# text-box content already present in mc:Choice
+_DOCX_PARAGRAPHS = etree.XPath("//w:p[not(ancestor::mc:Fallback)]", namespaces=DOCX_NS)
+
+
+def _docx_paragraph_text(element, parts):
+    """Collect a paragraph's run text, with tabs and line breaks as python-docx renders them"""
+    for child in element:
+        if child.tag == _W + "r":
+            for item in child:
+                if item.tag == _W + "t":
+                    parts.append(item.text or "")
+                elif item.tag == _W + "br":
+                    # Page and column breaks carry no text
+                    if item.get(_W + "type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                elif item.tag in _DOCX_RUN_TEXT:
+                    parts.append(_DOCX_RUN_TEXT[item.tag])
+        elif child.tag not in (_W + "pPr", _W + "p"):
+            # Hyperlinks, insertions, fields etc. wrap further runs; nested
+            # (text box) paragraphs are extracted on their own
+            _docx_paragraph_text(child, parts)
+    return parts
+
+
+def extract_text_from_docx(data):
+    """Extract text from DOCX bytes"""
+    # A DOCX is a zip; read the body XML directly instead of building
+    # python-docx's full object model
+    with zipfile.ZipFile(io.BytesIO(data)) as archive, archive.open("word/document.xml") as f:
+        tree = etree.parse(f)
+    elements = _DOCX_PARAGRAPHS(tree)
+    text = _join_text(["".join(_docx_paragraph_text(p, [])) for p in elements[:MAX_PARAS]])
+    if len(elements) > MAX_PARAS:
+        raise TruncatedExtraction(text, f"Only the first {MAX_PARAS} of {len(elements)} paragraphs were read; the analysis covers that part of the document only.")
+    return text
+
+
+@st.cache_resource(show_spinner=False)
+def get_tesseract_api():
+    """Load the Tesseract engine once per process"""
+    # The API object is not thread-safe, so callers must hold the returned lock
+    return PyTessBaseAPI(psm=PSM.AUTO, lang='eng'), threading.Lock()
+
+
+def extract_text_from_image(data):
+    """Extract text from image bytes with Tesseract OCR (tesserocr)"""
+    if not OCR_AVAILABLE:
+        raise RuntimeError("OCR engine not installed (tesserocr).")
+    api, lock = get_tesseract_api()
+    texts = []
+    with Image.open(io.BytesIO(data)) as image, lock:
+        # Multi-page images (e.g. TIFF) reuse the same engine for every frame
+        for frame in ImageSequence.Iterator(image):
+            api.SetImage(frame.convert("RGB"))
+            texts.append(api.GetUTF8Text())
+    return _join_text(texts)
+
+
+# Extractor kinds by MIME type, with the file suffix as fallback when the
+# browser reports a generic or empty type
+_EXT_DISPATCH = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/msword": "docx",
+    "image/png": "image",
+    "image/jpeg": "image",
+}
+_EXT_DISPATCH_BY_SUFFIX = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+}
+_EXTRACTORS = {
+    "pdf": extract_text_from_pdf,
+    "docx": extract_text_from_docx,
+    "image": extract_text_from_image,
+}
+_EXTRACT_ERRORS = {
+    "pdf": "Error extracting PDF",
+    "docx": "Error extracting DOCX",
+    "image": "Error processing image",
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _route(type_str: str, name: str) -> str:
+    """Resolve an upload's MIME type and name to an extractor kind (or "unsupported")"""
+    return (_EXT_DISPATCH.get(type_str)
+            or _EXT_DISPATCH_BY_SUFFIX.get(Path(name).suffix.lower(), "unsupported"))
+
+
+@st.cache_data(show_spinner=False, persist="disk", max_entries=200)
+def _extract_cached(key, kind, _data):
+    """
+    Extract text for one file's content; cached on the content hash (key),
+    so the raw bytes (_data) are never hashed by Streamlit.
+    Returns (text, notice or None). Results cut off at a fixed size limit are
+    cached with their notice; failures and transient shortfalls (OCR missing,
+    failing or out of time) raise and are therefore never cached.
+    """
     try:
-        image = Image.open(file)
-        # OCR functionality can be added later with pytesseract
-        return "Image OCR not yet implemented. Please upload PDF or DOCX files for now."
-    except Exception as e:
-        return f"Error processing image: {str(e)}"
+        return _EXTRACTORS[kind](_data), None
+    except TruncatedExtraction as e:
+        return e.text, e.notice
 
 
 def process_document(uploaded_file):
     """
     Main function to process any uploaded document
-    Returns extracted text or error message
+    Returns (text, notice, error): text is None exactly when error is set, and
+    the notice says when only part of the document could be read
     """
-    file_type = uploaded_file.type.lower()
-    
-    if 'pdf' in file_type:
-        return extract_text_from_pdf(uploaded_file)
-    elif 'word' in file_type or 'document' in file_type or uploaded_file.name.endswith('.docx'):
-        return extract_text_from_docx(uploaded_file)
-    elif 'image' in file_type or uploaded_file.name.lower().endswith(('.png', '.jpg', '.jpeg')):
-        return extract_text_from_image(uploaded_file)
-    else:
-        return f"Unsupported file type: {file_type}"
+    kind = _route(uploaded_file.type, uploaded_file.name)
+    if kind == "unsupported":
+        return None, None, f"Unsupported file type: {uploaded_file.type}"
+    # getbuffer() is a zero-copy view of the upload (getvalue() would copy it)
+    data = uploaded_file.getbuffer()
+    key = hashlib.blake2b(data, digest_size=16).hexdigest()
+    try:
+        text, notice = _extract_cached(key, kind, data)
+    except IncompleteExtraction as e:
+        text, notice = e.text, e.notice
+    except Exception as e:
+        return None, None, f"{_EXTRACT_ERRORS[kind]}: {str(e)}"
+    if not text:
+        # Nothing to analyze; don't send an empty document to the model
+        return None, None, f"{_EXTRACT_ERRORS[kind]}: no readable text found. {notice or ''}".rstrip()
+    return text, notice, None
+
+
+def process_documents(uploaded_files) -> list[tuple[str | None, str | None, str | None]]:
+    """Process several uploaded documents, returning (text, notice, error) in upload order"""
+    # One file at a time: PyMuPDF is not thread-safe
+    return [process_document(uploaded_file) for uploaded_file in uploaded_files]
+
+
+def warm_ocr_models():
+    """Load the available OCR engines ahead of the first upload that needs them"""
+    try:
+        if OCR_AVAILABLE:
+            get_tesseract_api()
+        if PDF_OCR_AVAILABLE:
+            get_ocr_reader()
+    except Exception as e:
+        print(f"OCR warm-up failed: {e}")
 
 
 def get_file_info(uploaded_file):
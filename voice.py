@@ -1,14 +1,18 @@
+import os
+import queue
 import threading
 import streamlit as st
 import pyttsx3
 import speech_recognition as sr
 
-# Robust TTS engine initialization
-try:
-    engine = pyttsx3.init()
-except Exception as e:
-    engine = None
-    st.warning("Text-to-speech is unavailable on this system.")
+# TTS engine created on first use and shared by the process (None if unavailable)
+@st.cache_resource(show_spinner=False)
+def _tts_engine():
+    try:
+        return pyttsx3.init()
+    except Exception as e:
+        print(f"Text-to-speech is unavailable on this system: {e}")
+        return None
 
 engine_lock = threading.Lock()
 
@@ -17,38 +21,49 @@ import tempfile
 import time
 import pygame
 
-# Initialize pygame mixer for audio playback
-pygame.mixer.init()
+def _speak_gtts(text: str) -> None:
+    tts = gTTS(text=text, lang='en')
+    # Initialize pygame mixer for audio playback (no-op once initialized)
+    pygame.mixer.init()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
+        tts.save(fp.name)
+        pygame.mixer.music.load(fp.name)
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            time.sleep(0.1)
+        os.unlink(fp.name)
 
-def speak(text: str) -> None:
-    if engine:
-        # Try local TTS first
+# A single worker thread owns the TTS engine and speaks queued text in order
+def _tts_worker(tts_q: queue.Queue) -> None:
+    while True:
+        text = tts_q.get()
         try:
-            def _speak():
+            engine = _tts_engine()
+            if engine:
+                # Try local TTS first
                 with engine_lock:
                     engine.say(text)
                     engine.runAndWait()
-            threading.Thread(target=_speak).start()
-            return
-        except Exception:
-            pass
-    
-    # Fallback to gTTS (Google TTS)
-    try:
-        def _speak_gtts():
-            tts = gTTS(text=text, lang='en')
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-                tts.save(fp.name)
-                pygame.mixer.music.load(fp.name)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.1)
-                os.unlink(fp.name)
-        threading.Thread(target=_speak_gtts).start()
-    except Exception as e:
-        st.warning(f"Audio output unavailable: {e}")
+            else:
+                # Fallback to gTTS (Google TTS)
+                _speak_gtts(text)
+        except Exception as e:
+            print(f"Audio output unavailable: {e}")
+        finally:
+            tts_q.task_done()
+
+# Queue feeding the worker; the worker starts on the first call, once per process
+@st.cache_resource(show_spinner=False)
+def _tts_queue() -> queue.Queue:
+    tts_q = queue.Queue()
+    threading.Thread(target=_tts_worker, args=(tts_q,), daemon=True).start()
+    return tts_q
+
+def speak(text: str) -> None:
+    _tts_queue().put(text)
 
 def stop_speech() -> None:
+    engine = _tts_engine()
     if engine:
         with engine_lock:
             engine.stop()
@@ -60,7 +75,7 @@ def listen_for_stop() -> None:
         try:
             audio = recognizer.listen(source, timeout=5)
             command = recognizer.recognize_google(audio).lower()
-            if "stop" in command and engine:
+            if "stop" in command:
                 stop_speech()
         except Exception:
             pass